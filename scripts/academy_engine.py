@@ -34,6 +34,7 @@ import json
 import random
 import subprocess
 import sys
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -138,6 +139,12 @@ TEACHING_RULES: dict[str, dict] = {
     },
 }
 
+# Flattened (probability, xp_bonus, templates) per skill for the teaching loop
+TEACHING_FLAT: dict[str, tuple[float, int, tuple[str, ...]]] = {
+    skill: (rule["probability"], rule["xp_bonus"], tuple(rule["templates"]))
+    for skill, rule in TEACHING_RULES.items()
+}
+
 # Enrollment flavor — why agents pick courses
 ENROLLMENT_REASONS: dict[str, list] = {
     "marketplace": ["wants to earn more RAPP", "tired of bad trades", "dreams of market mastery"],
@@ -165,64 +172,82 @@ def load_json(p: Path) -> dict:
 
 
 def save_json(p: Path, d: dict):
+    # Encode in one call and write once; json.dump issues a write per chunk
     with open(p, "w") as f:
-        json.dump(d, f, indent=4)
+        f.write(json.dumps(d, indent=4))
 
 
 def now_iso() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-
-def get_agent_skills(academy: dict, agent_name: str) -> list:
-    return academy.get("skills", {}).get(agent_name, [])
-
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
-def has_skill(academy: dict, agent_name: str, skill: str) -> bool:
-    return skill in get_agent_skills(academy, agent_name)
 
-
-def has_prerequisites(academy: dict, agent_name: str, course: dict) -> bool:
-    agent_skills = get_agent_skills(academy, agent_name)
+def has_prerequisites(agent_skills: set, course: dict) -> bool:
     for prereq in course.get("prerequisites", []):
         if prereq not in agent_skills:
             return False
     return True
 
 
-def is_enrolled(academy: dict, agent_name: str) -> bool:
-    return any(e["agent"] == agent_name and e["status"] == "active"
-               for e in academy.get("enrollments", []))
-
-
-def course_has_room(academy: dict, course: dict) -> bool:
-    enrolled = sum(1 for e in academy.get("enrollments", [])
-                   if e["courseId"] == course["id"] and e["status"] == "active")
-    return enrolled < course.get("max_students", 10)
-
-
 def _name_to_agent(agents: list) -> dict:
     """Build a name → agent dict for ID/avatar lookups."""
     return {a["name"]: a for a in agents}
 
 
-def academy_tick(dry_run: bool = False):
+def academy_tick(dry_run: bool = False) -> bool:
+    """Run one academy tick. Returns True if any state was changed."""
+    # Taken once: every enrollment, graduation, chat and action stamped this
+    # tick shares the same ts, so per-event sites must not call now_iso().
     ts = now_iso()
     academy = load_json(STATE_DIR / "academy.json")
     agents_data = load_json(STATE_DIR / "agents.json")
     agents = agents_data.get("agents", [])
     economy = load_json(STATE_DIR / "economy.json")
-    rel_data = load_json(STATE_DIR / "relationships.json")
+    balances = economy.setdefault("balances", {})
     chat_data = load_json(STATE_DIR / "chat.json")
     actions_data = load_json(STATE_DIR / "actions.json")
 
     active_agents = [a for a in agents if a.get("status") == "active"]
     agent_lookup = _name_to_agent(agents)
     courses = academy["courses"]
+    course_by_id = {c["id"]: c for c in courses}
+    # Cheapest first, so enrollment can stop at the first unaffordable course
+    courses_by_cost = sorted(courses, key=lambda c: c["tuition"])
     results = []
 
+    # Bind the academy collections once; every phase below works on these
+    enrollments = academy.setdefault("enrollments", [])
+    graduates = academy.setdefault("graduates", [])
+    skills_by_agent = academy.setdefault("skills", {})
+    stats = academy["stats"]
+
+    # Per-tick indexes, so enrollment checks don't rescan every enrollment
+    active_enrs = [e for e in enrollments if e["status"] == "active"]
+    enrolled_names = {e["agent"] for e in active_enrs}
+    course_fill = Counter(e["courseId"] for e in active_enrs)
+    # Membership sets alongside the persisted lists (which keep grant order)
+    skill_sets = {name: set(skills) for name, skills in skills_by_agent.items()}
+
+    # Next free chat/action ids, scanned once per tick. Not persisted in the
+    # files: other scripts append to them and allocate ids by max-scan too.
+    next_msg_num = max((int(m["id"].split("-")[1]) for m in chat_data.get("messages", [])
+                        if m["id"].startswith("msg-")), default=0) + 1
+    next_act_num = max((int(a["id"].split("-")[1]) for a in actions_data.get("actions", [])
+                        if a["id"].startswith("action-")), default=0) + 1
+
+    # Rolling windows — appends evict the oldest entry, no per-event slicing
+    chat_msgs = deque(chat_data.get("messages", []), maxlen=100)
+    actions = deque(actions_data.get("actions", []), maxlen=100)
+
+    # Bound once: the draws below run per agent, per course and per skill.
+    # Module-level functions (not a private Random) so random.seed() still applies.
+    rand, choice = random.random, random.choice
+
+    # Only rewrite the shared state files a phase actually touched
+    economy_dirty = chat_dirty = actions_dirty = False
+
     # ── Phase 1: Enrollment ──────────────────────────────────
     # Agents decide to enroll based on world, balance, and interests
-    unenrolled = [a for a in active_agents if not is_enrolled(academy, a["name"])]
+    unenrolled = [a for a in active_agents if a["name"] not in enrolled_names]
     random.shuffle(unenrolled)
 
     # Scale enrollment attempts with population
@@ -235,22 +260,23 @@ def academy_tick(dry_run: bool = False):
 
         name = agent["name"]
         world = agent.get("world", "hub")
-        balance = economy.get("balances", {}).get(name, 0)
+        balance = balances.get(name, 0)
 
         # Already has all skills? Skip.
-        agent_skills = get_agent_skills(academy, name)
+        agent_skills = skill_sets.get(name, set())
 
         # Find eligible courses
         eligible = []
-        for course in courses:
+        total_weight = 0.0
+        for course in courses_by_cost:
+            if balance < course["tuition"]:
+                break  # Every remaining course costs at least this much
             skill = course["skill"]
-            if has_skill(academy, name, skill):
+            if skill in agent_skills:
                 continue  # Already know this
-            if not has_prerequisites(academy, name, course):
-                continue
-            if not course_has_room(academy, course):
+            if not has_prerequisites(agent_skills, course):
                 continue
-            if balance < course["tuition"]:
+            if course_fill[course["id"]] >= course.get("max_students", 10):
                 continue
 
             # World affinity bonus
@@ -261,24 +287,30 @@ def academy_tick(dry_run: bool = False):
                 weight = 1.5
 
             eligible.append((course, weight))
+            total_weight += weight
 
         if not eligible:
             continue
 
-        # Weighted random selection — prefer world-aligned courses
-        course_list, weights = zip(*eligible)
-        chosen = random.choices(course_list, weights=weights, k=1)[0]
+        # Weighted random selection — prefer world-aligned courses.
+        # Same cumulative scan as random.choices(k=1), without its setup.
+        r = rand() * total_weight
+        acc = 0.0
+        chosen = eligible[-1][0]
+        for course, weight in eligible:
+            acc += weight
+            if acc > r:
+                chosen = course
+                break
 
         # Enrollment probability — not everyone wants school
-        if random.random() > 0.35:
+        if rand() > 0.35:
             continue
 
-        # Pay tuition
-        bal = economy.get("balances", {}).get(name, 0)
-        if bal < chosen["tuition"]:
-            continue
-        economy["balances"][name] = bal - chosen["tuition"]
-        academy["stats"]["totalTuitionCollected"] += chosen["tuition"]
+        # Pay tuition (eligibility already checked the balance)
+        balances[name] = balance - chosen["tuition"]
+        stats["totalTuitionCollected"] += chosen["tuition"]
+        economy_dirty = True
 
         enrollment_id = "enr-{:04d}".format(academy["nextEnrollmentId"])
         academy["nextEnrollmentId"] += 1
@@ -294,130 +326,126 @@ def academy_tick(dry_run: bool = False):
             "ticksRequired": chosen["duration_ticks"],
             "status": "active",
         }
-        academy.setdefault("enrollments", []).append(enrollment)
-        academy["stats"]["totalEnrollments"] += 1
+        enrollments.append(enrollment)
+        stats["totalEnrollments"] += 1
         new_enrollments += 1
+        active_enrs.append(enrollment)
+        enrolled_names.add(name)
+        course_fill[chosen["id"]] += 1
 
         world_reasons = ENROLLMENT_REASONS.get(world, ["seeking knowledge"])
-        reason = random.choice(world_reasons)
+        reason = choice(world_reasons)
         results.append(
             f"📚 {name} enrolled in {chosen['icon']} {chosen['name']} ({reason}) — {chosen['tuition']} RAPP tuition"
         )
 
-    # ── Phase 2: Progress ────────────────────────────────────
-    for enrollment in academy.get("enrollments", []):
-        if enrollment["status"] != "active":
-            continue
-        enrollment["ticksCompleted"] += 1
-
-    # ── Phase 3: Graduation ──────────────────────────────────
+    # ── Phase 2+3: Progress & Graduation ─────────────────────
+    # One pass over the active enrollments (including this tick's new ones)
     new_graduates = []
-    for enrollment in academy.get("enrollments", []):
-        if enrollment["status"] != "active":
+    for enrollment in active_enrs:
+        enrollment["ticksCompleted"] += 1
+        if enrollment["ticksCompleted"] < enrollment["ticksRequired"]:
             continue
-        if enrollment["ticksCompleted"] >= enrollment["ticksRequired"]:
-            enrollment["status"] = "graduated"
-            enrollment["graduatedAt"] = ts
-
-            agent_name = enrollment["agent"]
-            skill = enrollment["skill"]
-
-            # Grant skill
-            skills = academy.setdefault("skills", {})
-            agent_skills = skills.setdefault(agent_name, [])
-            if skill not in agent_skills:
-                agent_skills.append(skill)
-
-            # Find course for XP
-            course = next((c for c in courses if c["id"] == enrollment["courseId"]), None)
-            xp_reward = course["xp_reward"] if course else 50
-
-            # Credit XP as RAPP bonus
-            economy.setdefault("balances", {})[agent_name] = (
-                economy.get("balances", {}).get(agent_name, 0) + xp_reward
-            )
-
-            # Record graduation
-            academy.setdefault("graduates", []).append({
-                "agent": agent_name,
-                "skill": skill,
-                "course": enrollment["courseName"],
-                "graduatedAt": ts,
-                "xpEarned": xp_reward,
-            })
-            academy["stats"]["totalGraduations"] += 1
-            new_graduates.append((agent_name, enrollment, course))
-
-            tmpl = random.choice(GRADUATION_CELEBRATIONS)
-            msg = tmpl.format(
-                agent=agent_name, course=enrollment["courseName"],
-                skill=skill, world=course.get("world_affinity", "the metaverse") if course else "?",
-                xp=xp_reward,
-            )
-            results.append(msg)
-
-            # Post graduation announcement in chat
-            chat_msgs = chat_data.get("messages", [])
-            existing_ids = [m["id"] for m in chat_msgs]
-            msg_num = max((int(mid.split("-")[1]) for mid in existing_ids if mid.startswith("msg-")), default=0) + 1
-            agent_obj = agent_lookup.get(agent_name, {})
-            chat_msgs.append({
-                "id": "msg-{:03d}".format(msg_num),
-                "timestamp": ts,
-                "world": agent_obj.get("world", "hub"),
-                "author": {
-                    "id": agent_obj.get("id", "unknown"),
-                    "name": agent_name,
-                    "avatar": agent_obj.get("avatar", "🎓"),
-                    "type": "agent",
-                },
-                "content": f"Just graduated from {enrollment['courseName']}! {skill.replace('_',' ').title()} skill unlocked. 🎓",
-                "type": "chat",
-            })
-            chat_data["messages"] = chat_msgs[-100:]
+        enrollment["status"] = "graduated"
+        enrollment["graduatedAt"] = ts
+
+        agent_name = enrollment["agent"]
+        skill = enrollment["skill"]
+
+        # Grant skill
+        agent_skill_set = skill_sets.setdefault(agent_name, set())
+        if skill not in agent_skill_set:
+            agent_skill_set.add(skill)
+            skills_by_agent.setdefault(agent_name, []).append(skill)
+
+        # Find course for XP
+        course = course_by_id.get(enrollment["courseId"])
+        xp_reward = course["xp_reward"] if course else 50
+
+        # Credit XP as RAPP bonus
+        balances[agent_name] = balances.get(agent_name, 0) + xp_reward
+
+        # Record graduation
+        graduates.append({
+            "agent": agent_name,
+            "skill": skill,
+            "course": enrollment["courseName"],
+            "graduatedAt": ts,
+            "xpEarned": xp_reward,
+        })
+        stats["totalGraduations"] += 1
+        new_graduates.append((agent_name, enrollment, course))
+        economy_dirty = chat_dirty = True
+
+        tmpl = choice(GRADUATION_CELEBRATIONS)
+        msg = tmpl.format(
+            agent=agent_name, course=enrollment["courseName"],
+            skill=skill, world=course.get("world_affinity", "the metaverse") if course else "?",
+            xp=xp_reward,
+        )
+        results.append(msg)
+
+        # Post graduation announcement in chat
+        msg_num = next_msg_num
+        next_msg_num += 1
+        agent_obj = agent_lookup.get(agent_name, {})
+        chat_msgs.append({
+            "id": "msg-{:03d}".format(msg_num),
+            "timestamp": ts,
+            "world": agent_obj.get("world", "hub"),
+            "author": {
+                "id": agent_obj.get("id", "unknown"),
+                "name": agent_name,
+                "avatar": agent_obj.get("avatar", "🎓"),
+                "type": "agent",
+            },
+            "content": f"Just graduated from {enrollment['courseName']}! {skill.replace('_',' ').title()} skill unlocked. 🎓",
+            "type": "chat",
+        })
 
     # ── Phase 4: Teaching (ad-hoc lessons) ───────────────────
-    skilled_agents = {name: skills for name, skills in academy.get("skills", {}).items() if skills}
+    skilled_agents = {name: skills for name, skills in skills_by_agent.items() if skills}
+    active_by_name = {a["name"]: a for a in active_agents}
+    active_by_world = defaultdict(list)
+    for a in active_agents:
+        active_by_world[a.get("world")].append(a)
 
     for teacher_name, teacher_skills in skilled_agents.items():
-        teacher = next((a for a in active_agents if a["name"] == teacher_name), None)
+        teacher = active_by_name.get(teacher_name)
         if not teacher:
             continue
 
         for skill in teacher_skills:
-            rule = TEACHING_RULES.get(skill)
-            if not rule:
+            flat = TEACHING_FLAT.get(skill)
+            if not flat:
                 continue
-            if random.random() > rule["probability"]:
+            probability, xp, templates = flat
+            if rand() > probability:
                 continue
 
             # Find a student in the same world without this skill
-            same_world = [a for a in active_agents
-                          if a.get("world") == teacher.get("world")
-                          and a["name"] != teacher_name
-                          and not has_skill(academy, a["name"], skill)]
+            same_world = [a for a in active_by_world[teacher.get("world")]
+                          if a["name"] != teacher_name
+                          and skill not in skill_sets.get(a["name"], ())]
             if not same_world:
                 continue
 
-            student = random.choice(same_world)
-            xp = rule["xp_bonus"]
+            student = choice(same_world)
 
             # Grant XP
-            economy.setdefault("balances", {})[student["name"]] = (
-                economy.get("balances", {}).get(student["name"], 0) + xp
-            )
+            balances[student["name"]] = balances.get(student["name"], 0) + xp
 
-            tmpl = random.choice(rule["templates"])
+            tmpl = choice(templates)
             msg = tmpl.format(
                 teacher=teacher_name, student=student["name"],
                 world=teacher.get("world", "hub"),
             )
             results.append(f"  📖 {msg}")
+            economy_dirty = actions_dirty = True
 
             # Log as action
-            actions = actions_data.get("actions", [])
-            existing_ids = [a["id"] for a in actions]
-            act_num = max((int(aid.split("-")[1]) for aid in existing_ids if aid.startswith("action-")), default=0) + 1
+            act_num = next_act_num
+            next_act_num += 1
             teacher_obj = agent_lookup.get(teacher_name, {})
             student_obj = agent_lookup.get(student["name"], {})
             actions.append({
@@ -433,48 +461,53 @@ def academy_tick(dry_run: bool = False):
                     "xpGranted": xp,
                 },
             })
-            actions_data["actions"] = actions[-100:]
             break  # One lesson per teacher per tick
 
     # ── Phase 5: Trim & Stats ────────────────────────────────
     # Keep only last 200 enrollments
-    academy["enrollments"] = academy["enrollments"][-200:]
-    academy["graduates"] = academy["graduates"][-500:]
-
-    # Update stats
-    all_skills = academy.get("skills", {})
-    if all_skills:
-        most_skilled_name = max(all_skills, key=lambda n: len(all_skills[n]))
-        academy["stats"]["mostSkilled"] = {
+    academy["enrollments"] = enrollments = enrollments[-200:]
+    academy["graduates"] = graduates[-500:]
+
+    # Update stats — one pass over skills feeds both the stat and the report
+    most_skilled_name, most_skilled_count = None, -1
+    total_skilled = total_skills_granted = 0
+    for name, skills in skills_by_agent.items():
+        n = len(skills)
+        if n > most_skilled_count:
+            most_skilled_name, most_skilled_count = name, n
+        if n:
+            total_skilled += 1
+            total_skills_granted += n
+    if most_skilled_name is not None:
+        stats["mostSkilled"] = {
             "name": most_skilled_name,
-            "skillCount": len(all_skills[most_skilled_name]),
-            "skills": all_skills[most_skilled_name],
+            "skillCount": most_skilled_count,
+            "skills": skills_by_agent[most_skilled_name],
         }
 
-    # Most popular course
-    from collections import Counter
+    # Most popular course (and the active count for the report) in one pass
     course_counts = Counter()
-    for e in academy.get("enrollments", []):
+    active_enrollments = 0
+    for e in enrollments:
         course_counts[e["courseName"]] += 1
+        if e["status"] == "active":
+            active_enrollments += 1
     if course_counts:
         top_course = course_counts.most_common(1)[0]
-        academy["stats"]["mostPopularCourse"] = {
+        stats["mostPopularCourse"] = {
             "name": top_course[0], "enrollments": top_course[1]
         }
 
     # ── Report ───────────────────────────────────────────────
-    active_enrollments = sum(1 for e in academy.get("enrollments", []) if e["status"] == "active")
-    total_skilled = sum(1 for s in all_skills.values() if s)
-    total_skills_granted = sum(len(s) for s in all_skills.values())
 
     print(f"  🎓 RAPPter Academy:")
     print(f"     Active enrollments:  {active_enrollments}")
-    print(f"     Total graduates:     {academy['stats']['totalGraduations']}")
+    print(f"     Total graduates:     {stats['totalGraduations']}")
     print(f"     Skilled agents:      {total_skilled}/{len(active_agents)}")
     print(f"     Total skills granted:{total_skills_granted}")
-    print(f"     Tuition collected:   {academy['stats']['totalTuitionCollected']} RAPP")
-    if academy["stats"].get("mostSkilled"):
-        ms = academy["stats"]["mostSkilled"]
+    print(f"     Tuition collected:   {stats['totalTuitionCollected']} RAPP")
+    if stats.get("mostSkilled"):
+        ms = stats["mostSkilled"]
         print(f"     🏆 Most skilled: {ms['name']} ({', '.join(ms['skills'])})")
 
     for r in results[:20]:
@@ -482,25 +515,41 @@ def academy_tick(dry_run: bool = False):
     if len(results) > 20:
         print(f"     ... and {len(results) - 20} more")
 
+    # Every active enrollment advances a tick; the other phases flag their files
+    state_changed = bool(active_enrs) or economy_dirty or chat_dirty or actions_dirty
+
     if dry_run:
         print(f"\n  🏁 DRY RUN — no state changes written")
-        return
+        return state_changed
+
+    if not state_changed:
+        print(f"\n  💤 Nothing changed — state left untouched")
+        return False
 
     # Save
     academy["_meta"]["lastUpdate"] = ts
     save_json(STATE_DIR / "academy.json", academy)
-    save_json(STATE_DIR / "economy.json", economy)
-    chat_data["_meta"] = {"lastUpdate": ts, "messageCount": len(chat_data.get("messages", []))}
-    save_json(STATE_DIR / "chat.json", chat_data)
-    actions_data["_meta"] = {"lastUpdate": ts}
-    save_json(STATE_DIR / "actions.json", actions_data)
+    if economy_dirty:
+        save_json(STATE_DIR / "economy.json", economy)
+    if chat_dirty:
+        chat_data["messages"] = list(chat_msgs)
+        chat_data["_meta"] = {"lastUpdate": ts, "messageCount": len(chat_data["messages"])}
+        save_json(STATE_DIR / "chat.json", chat_data)
+    if actions_dirty:
+        actions_data["actions"] = list(actions)
+        actions_data["_meta"] = {"lastUpdate": ts}
+        save_json(STATE_DIR / "actions.json", actions_data)
 
     print(f"\n  ✅ Academy state saved")
+    return True
 
 
 def commit_and_push(msg: str) -> bool:
-    subprocess.run(["git", "add", "-A"], cwd=BASE_DIR, capture_output=True)
-    subprocess.run(["git", "commit", "-m", msg], cwd=BASE_DIR, capture_output=True)
+    # Stage and commit in one shell; commit only runs if something is staged
+    subprocess.run(
+        ["sh", "-c", 'git add -A && { git diff --cached --quiet || git commit -m "$1"; }', "--", msg],
+        cwd=BASE_DIR, capture_output=True,
+    )
     r = subprocess.run(["git", "push"], cwd=BASE_DIR, capture_output=True, text=True)
     return r.returncode == 0
 
@@ -511,9 +560,9 @@ def main():
 
     print(f"🎓 RAPPter Academy — {'DRY RUN' if dry_run else 'LIVE'}\n")
 
-    academy_tick(dry_run=dry_run)
+    changed = academy_tick(dry_run=dry_run)
 
-    if not dry_run and not no_push:
+    if changed and not dry_run and not no_push:
         if commit_and_push("[academy] RAPPter Academy training tick"):
             print("  📤 Pushed to GitHub")
         else:
@@ -13,9 +13,12 @@ Usage:
     content = brain.generate(agent_id, action_type, context)
 """
 
+import http.client
 import json
 import random
-import subprocess
+import time
+import urllib.error
+import urllib.request
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -25,6 +28,8 @@ MEMORY_DIR = STATE_DIR / "memory"
 
 MODEL = "gpt-4o"
 API_URL = "https://models.inference.ai.azure.com/chat/completions"
+LLM_TIMEOUT = 15  # seconds per attempt
+LLM_ATTEMPTS = 3
 
 # ─── Memory ───────────────────────────────────────────────────────────
 
@@ -127,7 +132,11 @@ def memory_summary(memory: dict) -> str:
 
 def _call_llm(token: str, system_prompt: str, user_prompt: str,
               max_tokens: int = 120, temperature: float = 0.9) -> str:
-    """Call GitHub Models API. Returns response text or empty string."""
+    """Call GitHub Models API. Returns response text or empty string.
+
+    Each attempt has its own timeout. Timeouts, transport errors, 429 and
+    5xx are retried with exponential backoff; other failures return "".
+    """
     if not token:
         return ""
 
@@ -141,24 +150,40 @@ def _call_llm(token: str, system_prompt: str, user_prompt: str,
         "temperature": temperature,
     }
 
-    result = subprocess.run(
-        ["curl", "-s", "-X", "POST", API_URL,
-         "-H", f"Authorization: Bearer {token}",
-         "-H", "Content-Type: application/json",
-         "-d", json.dumps(payload)],
-        capture_output=True, text=True, timeout=15,
+    request = urllib.request.Request(
+        API_URL,
+        data=json.dumps(payload).encode(),
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        method="POST",
     )
+    for attempt in range(LLM_ATTEMPTS):
+        try:
+            with urllib.request.urlopen(request, timeout=LLM_TIMEOUT) as resp:
+                data = json.load(resp)
+            break
+        except urllib.error.HTTPError as e:
+            e.close()
+            if e.code != 429 and e.code < 500:
+                return ""
+        except ValueError:
+            return ""  # malformed payload
+        except (OSError, http.client.HTTPException):
+            pass  # URLError, socket timeout, truncated response — transient
+        if attempt < LLM_ATTEMPTS - 1:
+            time.sleep(2 ** attempt + random.uniform(0, 1))
+    else:
+        return ""
 
     try:
-        data = json.loads(result.stdout)
         content = data["choices"][0]["message"]["content"].strip()
-        if content.startswith('"') and content.endswith('"'):
-            content = content[1:-1]
-        return content
-    except (json.JSONDecodeError, KeyError, IndexError):
-        return ""
-    except subprocess.TimeoutExpired:
+    except (KeyError, IndexError, TypeError, AttributeError):
         return ""
+    if content.startswith('"') and content.endswith('"'):
+        content = content[1:-1]
+    return content
 
 
 def _build_persona(agent_reg: dict, npc_def: dict, memory: dict) -> str:
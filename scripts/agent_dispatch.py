@@ -18,11 +18,15 @@ Options:
     --dry-run           Preview without writing state
 """
 
+import functools
+import itertools
 import json
+import os
 import random
 import subprocess
 import sys
 import argparse
+from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -32,28 +36,34 @@ WORLDS_DIR = BASE_DIR / "worlds"
 AGENTS_DIR = BASE_DIR / "agents"
 
 # Agent brain — memory-aware LLM module
-from agent_brain import AgentBrain, load_memory, save_memory, record_experience
+from agent_brain import AgentBrain, load_memory, save_memory, record_experience, _call_llm
 
-MODEL = "gpt-4o"
-API_URL = "https://models.inference.ai.azure.com/chat/completions"
 VALID_EMOTES = ["wave", "dance", "bow", "clap", "think", "celebrate"]
 
 
 # ─── Data helpers ──────────────────────────────────────────────────────
 
 def load_json(path: Path) -> dict:
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return {}
+    # Single bytes read, no exists() stat; json.loads detects UTF-8 itself
+    try:
+        return json.loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
 
 
 def save_json(path: Path, data: dict):
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    # Serialize fully, then swap in — a failed run never leaves a torn file
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp.write_text(json.dumps(data, indent=4, ensure_ascii=False))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)  # never leave it for `git add -A` to publish
+        raise
 
 
-def get_next_id(prefix: str, existing_ids: list) -> str:
+def id_allocator(prefix: str, existing_ids):
+    """Scan existing IDs once; return a callable yielding the next prefix-NNN."""
     max_num = 0
     for eid in existing_ids:
         if eid.startswith(prefix):
@@ -62,7 +72,8 @@ def get_next_id(prefix: str, existing_ids: list) -> str:
                 max_num = max(max_num, num)
             except ValueError:
                 pass
-    return f"{prefix}{max_num + 1:03d}"
+    seq = itertools.count(max_num + 1)
+    return lambda: f"{prefix}{next(seq):03d}"
 
 
 def get_gh_token() -> str:
@@ -77,23 +88,30 @@ def get_gh_token() -> str:
 def load_registry() -> dict:
     """Load all agent registry entries from agents/*.agent.json."""
     registry = {}
-    for f in sorted(AGENTS_DIR.glob("*.agent.json")):
-        data = load_json(f)
+    # scandir hands back cached d_type, so no per-entry stat or Path objects
+    with os.scandir(AGENTS_DIR) as it:
+        paths = sorted(e.path for e in it
+                       if e.name.endswith(".agent.json") and not e.name.startswith(".")
+                       and e.is_file())
+    for f in paths:
+        data = load_json(Path(f))
         if data.get("id"):
             registry[data["id"]] = data
     return registry
 
 
+@functools.lru_cache(maxsize=1)
+def world_dirs() -> tuple:
+    """List worlds/*/ once per run; both world loaders walk the same dirs."""
+    with os.scandir(WORLDS_DIR) as it:
+        return tuple(Path(p) for p in sorted(e.path for e in it if e.is_dir()))
+
+
 def load_world_npcs() -> dict:
     """Load NPC dialogue/personality from worlds/*/npcs.json."""
     npcs = {}
-    for world_dir in sorted(WORLDS_DIR.iterdir()):
-        if not world_dir.is_dir():
-            continue
-        npc_file = world_dir / "npcs.json"
-        if not npc_file.exists():
-            continue
-        data = load_json(npc_file)
+    for world_dir in world_dirs():
+        data = load_json(world_dir / "npcs.json")  # {} when absent
         for npc in data.get("npcs", []):
             entry = {**npc, "_world": world_dir.name}
             npcs[npc["id"]] = entry
@@ -105,9 +123,7 @@ def load_world_npcs() -> dict:
 def load_world_bounds() -> dict:
     """Load bounds from worlds/*/config.json."""
     bounds = {}
-    for world_dir in sorted(WORLDS_DIR.iterdir()):
-        if not world_dir.is_dir():
-            continue
+    for world_dir in world_dirs():
         config = load_json(world_dir / "config.json")
         b = config.get("bounds", {})
         if b:
@@ -129,6 +145,18 @@ def find_npc_for_agent(agent_id: str, npc_lookup: dict):
     return None
 
 
+def npc_finder(npc_lookup: dict):
+    """Per-run memo of find_npc_for_agent; poke reactions re-resolve the same IDs."""
+    cache = {}
+
+    def find(agent_id: str):
+        if agent_id not in cache:
+            cache[agent_id] = find_npc_for_agent(agent_id, npc_lookup)
+        return cache[agent_id]
+
+    return find
+
+
 def random_position(world: str, bounds: dict) -> dict:
     b = bounds.get(world, bounds.get("hub", {"x": (-15, 15), "z": (-15, 15)}))
     return {
@@ -195,32 +223,7 @@ Respond as {name}:"""
 
 Generate a brief in-character observation or comment as {name}. React to what's happening or share a thought:"""
 
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "max_tokens": 100,
-        "temperature": 0.9,
-    }
-
-    result = subprocess.run(
-        ["curl", "-s", "-X", "POST", API_URL,
-         "-H", f"Authorization: Bearer {token}",
-         "-H", "Content-Type: application/json",
-         "-d", json.dumps(payload)],
-        capture_output=True, text=True,
-    )
-
-    try:
-        data = json.loads(result.stdout)
-        content = data["choices"][0]["message"]["content"].strip()
-        if content.startswith('"') and content.endswith('"'):
-            content = content[1:-1]
-        return content
-    except (json.JSONDecodeError, KeyError, IndexError):
-        return ""
+    return _call_llm(token, system_prompt, user_prompt, max_tokens=100, temperature=0.9)
 
 
 # ─── Fallback: dialogue-based (no LLM) ───────────────────────────────
@@ -233,8 +236,10 @@ def pick_dialogue_line(npc_def: dict) -> str:
 
 # ─── Agent action execution ──────────────────────────────────────────
 
-def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
-                         agents: list, actions: list, messages: list,
+def execute_agent_action(agent_id: str, registry: dict, find_npc,
+                         agents: list, agents_by_id: dict, agents_by_world: dict,
+                         actions: list, messages: list,
+                         next_action_id, next_msg_id,
                          bounds: dict, timestamp: str, token: str,
                          respond_to_msg: dict = None, poked: bool = False,
                          brain: AgentBrain = None) -> dict:
@@ -247,11 +252,11 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
     if reg.get("controller", "system") != "system":
         return {"agent": agent_id, "error": "non-system controller, skipping"}
 
-    agent = next((a for a in agents if a["id"] == agent_id), None)
+    agent = agents_by_id.get(agent_id)
     if not agent:
         return {"agent": agent_id, "error": "not in agents.json"}
 
-    npc_def = find_npc_for_agent(agent_id, npc_lookup)
+    npc_def = find_npc(agent_id)
     world = agent.get("world", reg.get("world", "hub"))
 
     # Load agent memory
@@ -264,8 +269,8 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
         activity = "chat_poke"
     elif brain and token:
         # Let the LLM decide based on personality + memory + world context
-        nearby = [a.get("name", a["id"]) for a in agents
-                  if a.get("world") == world and a["id"] != agent_id]
+        nearby = [a.get("name", a["id"]) for a in agents_by_world[world]
+                  if a["id"] != agent_id]
         recent_world_chat = [m for m in messages[-20:] if m.get("world") == world]
         world_ctx = {
             "world": world,
@@ -281,8 +286,6 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
         activity = random.choices(
             list(weights.keys()), weights=list(weights.values()))[0]
 
-    action_ids = [a["id"] for a in actions]
-    msg_ids = [m["id"] for m in messages]
     new_actions = []
     new_messages = []
     poke_target_id = None
@@ -293,11 +296,15 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
         if roaming and random.random() < 0.2:
             other_worlds = [w for w in bounds if w != world]
             if other_worlds:
+                old_world = agent.get("world")
                 world = random.choice(other_worlds)
                 agent["world"] = world
+                # Rare: rebuild both buckets so they keep agents.json order
+                for w in (old_world, world):
+                    agents_by_world[w] = [a for a in agents if a.get("world") == w]
 
         new_pos = random_position(world, bounds)
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+        aid = next_action_id()
         new_actions.append({
             "id": aid, "timestamp": timestamp, "agentId": agent_id,
             "type": "move", "world": world,
@@ -356,7 +363,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
         if not content:
             # No dialogue available — fall back to move
             new_pos = random_position(world, bounds)
-            aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+            aid = next_action_id()
             new_actions.append({
                 "id": aid, "timestamp": timestamp, "agentId": agent_id,
                 "type": "move", "world": world,
@@ -369,7 +376,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
             agent["action"] = "walking"
             summary = f"🚶 {reg['name']} moved (no dialogue)"
         else:
-            mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+            mid = next_msg_id()
             new_messages.append({
                 "id": mid, "timestamp": timestamp, "world": world,
                 "author": {
@@ -383,7 +390,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
             agent["action"] = "chatting"
 
             # Add action record for chat
-            aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+            aid = next_action_id()
             action_data = {"message": content}
             if respond_to_msg:
                 action_data["respondingTo"] = respond_to_msg.get("id")
@@ -400,9 +407,8 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
     elif activity == "poke":
         # Autonomous agent-to-agent poke: find someone in the same world
         same_world = [
-            a for a in agents
+            a for a in agents_by_world[world]
             if a["id"] != agent_id
-            and a.get("world") == world
             and a.get("status") == "active"
             and a["id"] in registry  # target must be in registry to react
         ]
@@ -416,7 +422,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
             poker_name = reg.get("name", agent_id)
 
             # Record the poke action
-            aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+            aid = next_action_id()
             new_actions.append({
                 "id": aid, "timestamp": timestamp, "agentId": agent_id,
                 "type": "interact", "world": world,
@@ -428,7 +434,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
             })
 
             # Poker says something about the poke
-            mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+            mid = next_msg_id()
             new_messages.append({
                 "id": mid, "timestamp": timestamp, "world": world,
                 "author": {
@@ -446,7 +452,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
 
     if activity == "emote":
         emote = random.choice(VALID_EMOTES)
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+        aid = next_action_id()
         new_actions.append({
             "id": aid, "timestamp": timestamp, "agentId": agent_id,
             "type": "emote", "world": world,
@@ -458,7 +464,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
     elif activity == "post":
         # "post" not yet implemented — fall back to chat
         content = pick_dialogue_line(npc_def) or f"*{reg.get('name', agent_id)} looks around thoughtfully*"
-        mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+        mid = next_msg_id()
         new_messages.append({
             "id": mid, "timestamp": timestamp, "world": world,
             "author": {
@@ -469,7 +475,7 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
             },
             "content": content, "type": "chat",
         })
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+        aid = next_action_id()
         new_actions.append({
             "id": aid, "timestamp": timestamp, "agentId": agent_id,
             "type": "chat", "world": world, "data": {"message": content},
@@ -542,32 +548,47 @@ def execute_agent_action(agent_id: str, registry: dict, npc_lookup: dict,
 
 # ─── Validation ──────────────────────────────────────────────────────
 
+def has_duplicate_ids(records: list) -> bool:
+    """True as soon as an id repeats; no full id list is built."""
+    seen = set()
+    for r in records:
+        rid = r["id"]
+        if rid in seen:
+            return True
+        seen.add(rid)
+    return False
+
+
 def validate_state(agents_data, actions_data, chat_data, bounds):
     """Quick pre-write validation. Returns list of errors."""
     errors = []
     agents = agents_data.get("agents", [])
     agent_ids = {a["id"] for a in agents}
 
+    # Resolve each world's (x0, x1, z0, z1) once rather than per agent
+    world_limits = {}
     for agent in agents:
         world = agent.get("world", "hub")
+        limits = world_limits.get(world)
+        if limits is None:
+            b = bounds.get(world, bounds.get("hub", {"x": (-15, 15), "z": (-15, 15)}))
+            limits = world_limits[world] = (b["x"][0], b["x"][1], b["z"][0], b["z"][1])
+        x0, x1, z0, z1 = limits
         pos = agent.get("position", {})
-        b = bounds.get(world, bounds.get("hub", {"x": (-15, 15), "z": (-15, 15)}))
         x, z = pos.get("x", 0), pos.get("z", 0)
-        if not (b["x"][0] <= x <= b["x"][1]):
+        if not (x0 <= x <= x1):
             errors.append(f"Agent {agent['id']}: x={x} out of bounds for {world}")
-        if not (b["z"][0] <= z <= b["z"][1]):
+        if not (z0 <= z <= z1):
             errors.append(f"Agent {agent['id']}: z={z} out of bounds for {world}")
 
     for action in actions_data.get("actions", [])[-20:]:
         if action.get("agentId") and action["agentId"] not in agent_ids:
             errors.append(f"Action {action['id']}: unknown agent {action['agentId']}")
 
-    action_ids = [a["id"] for a in actions_data.get("actions", [])]
-    if len(action_ids) != len(set(action_ids)):
+    if has_duplicate_ids(actions_data.get("actions", [])):
         errors.append("Duplicate action IDs")
 
-    msg_ids = [m["id"] for m in chat_data.get("messages", [])]
-    if len(msg_ids) != len(set(msg_ids)):
+    if has_duplicate_ids(chat_data.get("messages", [])):
         errors.append("Duplicate message IDs")
 
     return errors
@@ -594,7 +615,7 @@ def main():
 
     # Load everything
     registry = load_registry()
-    npc_lookup = load_world_npcs()
+    find_npc = npc_finder(load_world_npcs())
     bounds = load_world_bounds()
 
     agents_data = load_json(STATE_DIR / "agents.json")
@@ -605,6 +626,17 @@ def main():
     actions = actions_data.get("actions", [])
     messages = chat_data.get("messages", [])
 
+    # ID counters: scanned once here, then advanced as actions are generated
+    next_action_id = id_allocator("action-", (a["id"] for a in actions))
+    next_msg_id = id_allocator("msg-", (m["id"] for m in messages))
+
+    # Index agents once; execute_agent_action keeps the world index current
+    agents_by_id = {}
+    agents_by_world = defaultdict(list)
+    for a in agents:
+        agents_by_id.setdefault(a["id"], a)  # first entry wins, as the old scan did
+        agents_by_world[a.get("world")].append(a)
+
     token = "" if args.no_llm else get_gh_token()
     brain = AgentBrain(token) if token else None
 
@@ -612,6 +644,11 @@ def main():
         print("❌ No registry entries found. Run: python scripts/build_agent_registry.py")
         sys.exit(1)
 
+    # Registry entries by home world, in registry order, for --world / --respond-to
+    registry_by_world = defaultdict(list)
+    for aid, reg in registry.items():
+        registry_by_world[reg.get("world")].append((aid, reg))
+
     # Determine which agents to activate
     target_agents = []
     respond_to_msg = None
@@ -624,9 +661,8 @@ def main():
 
     elif args.world:
         target_agents = [
-            aid for aid, reg in registry.items()
-            if reg.get("world") == args.world
-            and reg.get("controller", "system") == "system"
+            aid for aid, reg in registry_by_world[args.world]
+            if reg.get("controller", "system") == "system"
         ]
         if not target_agents:
             print(f"❌ No system agents registered in world '{args.world}'")
@@ -645,22 +681,22 @@ def main():
 
         # Find agents in the same world (excluding the message author)
         candidates = [
-            aid for aid, reg in registry.items()
-            if reg.get("world") == msg_world
-            and reg.get("controller", "system") == "system"
+            aid for aid, reg in registry_by_world[msg_world]
+            if reg.get("controller", "system") == "system"
             and aid != author_id
             and reg.get("behavior", {}).get("respondToChat", True)
         ]
 
         # Also include agents currently in that world (they may have roamed)
-        for agent in agents:
+        seen = set(candidates)
+        for agent in agents_by_world[msg_world]:
             aid = agent["id"]
             if (aid in registry
-                    and agent.get("world") == msg_world
                     and aid != author_id
-                    and aid not in candidates
+                    and aid not in seen
                     and registry[aid].get("controller", "system") == "system"):
                 candidates.append(aid)
+                seen.add(aid)
 
         if not candidates:
             print(f"⚠️ No agents available to respond in {msg_world}")
@@ -684,7 +720,8 @@ def main():
     results = []
     for aid in target_agents:
         result = execute_agent_action(
-            aid, registry, npc_lookup, agents, actions, messages,
+            aid, registry, find_npc, agents, agents_by_id, agents_by_world,
+            actions, messages, next_action_id, next_msg_id,
             bounds, timestamp, token, respond_to_msg=respond_to_msg,
             poked=args.poke, brain=brain,
         )
@@ -704,7 +741,8 @@ def main():
         print(f"\n  🔁 {len(poke_targets)} poke reaction(s):")
         for tid in poke_targets:
             reaction = execute_agent_action(
-                tid, registry, npc_lookup, agents, actions, messages,
+                tid, registry, find_npc, agents, agents_by_id, agents_by_world,
+                actions, messages, next_action_id, next_msg_id,
                 bounds, timestamp, token, poked=True, brain=brain,
             )
             results.append(reaction)
@@ -760,8 +798,11 @@ def main():
     if not args.no_push:
         agent_names = [r.get("name", r["agent"]) for r in results if "error" not in r]
         commit_msg = f"[action] {', '.join(agent_names[:3])} — agent dispatch"
-        subprocess.run(["git", "add", "-A"], cwd=BASE_DIR, capture_output=True)
-        subprocess.run(["git", "commit", "-m", commit_msg], cwd=BASE_DIR, capture_output=True)
+        # Stage and commit in one shell; commit only runs if something is staged
+        subprocess.run(
+            ["sh", "-c", 'git add -A && { git diff --cached --quiet || git commit -m "$1"; }', "--", commit_msg],
+            cwd=BASE_DIR, capture_output=True,
+        )
         result = subprocess.run(["git", "push"], cwd=BASE_DIR, capture_output=True, text=True)
         if result.returncode == 0:
             print(f"📦 Pushed: {commit_msg}")
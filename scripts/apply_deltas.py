@@ -22,7 +22,7 @@ Delta file format (state/inbox/{unique-id}.json):
 from __future__ import annotations
 import json
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
@@ -31,6 +31,9 @@ STATE_DIR = BASE_DIR / "state"
 WORLDS_DIR = BASE_DIR / "worlds"
 FEED_DIR = BASE_DIR / "feed"
 
+# actions.json / chat.json keep a rolling window, like every other state writer
+MAX_ENTRIES = 100
+
 
 def load_json(path: Path) -> dict:
     """Load JSON file, returning empty dict on failure."""
@@ -48,26 +51,68 @@ def save_json(path: Path, data: dict):
         f.write("\n")
 
 
-def apply_delta(delta_path: Path, stats: dict):
-    """Apply a single delta file to canonical state."""
-    delta = load_json(delta_path)
+class StateCache:
+    """Canonical state files, loaded on first use and saved once after all deltas."""
+
+    def __init__(self):
+        self.files: dict[Path, dict] = {}
+        self._agents_by_id: dict | None = None
+        self._object_ids: dict[Path, set] = {}
+        self._windows: dict[Path, str] = {}
+
+    def load(self, path: Path) -> dict:
+        data = self.files.get(path)
+        if data is None:
+            data = self.files[path] = load_json(path)
+        return data
+
+    def agents_by_id(self, agents: list) -> dict:
+        """Index of agents.json entries by id, kept in sync by the caller."""
+        if self._agents_by_id is None:
+            self._agents_by_id = {}
+            for agent in agents:
+                self._agents_by_id.setdefault(agent.get("id"), agent)
+        return self._agents_by_id
+
+    def object_ids(self, path: Path, objects: list) -> set:
+        """Ids already in a world's objects.json, kept in sync by the caller."""
+        ids = self._object_ids.get(path)
+        if ids is None:
+            ids = self._object_ids[path] = {o.get("id") for o in objects}
+        return ids
+
+    def window(self, path: Path, key: str) -> list:
+        """Rolling list at data[key]; trimmed to MAX_ENTRIES once, in save_all."""
+        self._windows[path] = key
+        return self.load(path).setdefault(key, [])
+
+    def save_all(self):
+        for path, key in self._windows.items():
+            entries = self.files[path][key]
+            if len(entries) > MAX_ENTRIES:
+                del entries[:-MAX_ENTRIES]
+        for path, data in self.files.items():
+            save_json(path, data)
+
+
+def apply_delta(delta_path: Path, delta: dict, stats: dict, cache: StateCache):
+    """Apply a single delta (already parsed from delta_path) to the cached state."""
     if not delta:
         print(f"  ⚠ Skipping {delta_path.name}: empty or invalid JSON")
         return False
 
     agent_id = delta.get("agent_id", "unknown")
-    timestamp = delta.get("timestamp", datetime.utcnow().isoformat() + "Z")
+    timestamp = delta.get("timestamp")
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     applied = False
 
     # 1. Append actions to state/actions.json
     if "actions" in delta and delta["actions"]:
         actions_path = STATE_DIR / "actions.json"
-        actions_data = load_json(actions_path)
-        if "actions" not in actions_data:
-            actions_data["actions"] = []
-        actions_data["actions"].extend(delta["actions"])
+        cache.window(actions_path, "actions").extend(delta["actions"])
+        actions_data = cache.load(actions_path)
         actions_data.setdefault("_meta", {})["lastUpdate"] = timestamp
-        save_json(actions_path, actions_data)
         stats["actions"] += len(delta["actions"])
         applied = True
         print(f"  ✓ Appended {len(delta['actions'])} action(s)")
@@ -75,39 +120,33 @@ def apply_delta(delta_path: Path, stats: dict):
     # 2. Append messages to state/chat.json
     if "messages" in delta and delta["messages"]:
         chat_path = STATE_DIR / "chat.json"
-        chat_data = load_json(chat_path)
-        if "messages" not in chat_data:
-            chat_data["messages"] = []
-        chat_data["messages"].extend(delta["messages"])
+        cache.window(chat_path, "messages").extend(delta["messages"])
+        chat_data = cache.load(chat_path)
         chat_data.setdefault("_meta", {})["lastUpdate"] = timestamp
-        save_json(chat_path, chat_data)
         stats["messages"] += len(delta["messages"])
         applied = True
         print(f"  ✓ Appended {len(delta['messages'])} message(s)")
 
     # 3. Upsert agent in state/agents.json
     if "agent_update" in delta and delta["agent_update"]:
-        agents_path = STATE_DIR / "agents.json"
-        agents_data = load_json(agents_path)
-        if "agents" not in agents_data:
-            agents_data["agents"] = []
-
         update = delta["agent_update"]
         update_id = update.get("id")
         if update_id:
-            # Find and update existing agent, or append new
-            found = False
-            for i, agent in enumerate(agents_data["agents"]):
-                if agent.get("id") == update_id:
-                    agents_data["agents"][i].update(update)
-                    found = True
-                    break
-            if not found:
-                agents_data["agents"].append(update)
+            agents_data = cache.load(STATE_DIR / "agents.json")
+            agents = agents_data.setdefault("agents", [])
+            by_id = cache.agents_by_id(agents)
+
+            # Update existing agent in place, or append new
+            agent = by_id.get(update_id)
+            found = agent is not None
+            if found:
+                agent.update(update)
+            else:
+                agents.append(update)
+                by_id[update_id] = update
 
             agents_data.setdefault("_meta", {})["lastUpdate"] = timestamp
-            agents_data["_meta"]["agentCount"] = len(agents_data["agents"])
-            save_json(agents_path, agents_data)
+            agents_data["_meta"]["agentCount"] = len(agents)
             stats["agents"] += 1
             applied = True
             print(f"  ✓ {'Updated' if found else 'Added'} agent `{update_id}`")
@@ -119,13 +158,14 @@ def apply_delta(delta_path: Path, stats: dict):
         entries = obj_data.get("entries", [])
         if entries:
             objects_path = WORLDS_DIR / world / "objects.json"
-            world_data = load_json(objects_path)
+            world_data = cache.load(objects_path)
             if "objects" not in world_data:
                 world_data["objects"] = []
 
-            # Deduplicate by id
-            existing_ids = {o.get("id") for o in world_data["objects"]}
+            # Deduplicate by id against the world's running id set
+            existing_ids = cache.object_ids(objects_path, world_data["objects"])
             new_objects = [o for o in entries if o.get("id") not in existing_ids]
+            existing_ids.update(o.get("id") for o in new_objects)
 
             world_data["objects"].extend(new_objects)
             world_data.setdefault("_meta", {})["lastUpdated"] = timestamp
@@ -133,7 +173,6 @@ def apply_delta(delta_path: Path, stats: dict):
             if agent_id not in contributors:
                 contributors.append(agent_id)
                 world_data["_meta"]["contributors"] = contributors
-            save_json(objects_path, world_data)
             stats["objects"] += len(new_objects)
             applied = True
             print(f"  ✓ Added {len(new_objects)} object(s) to {world}")
@@ -141,11 +180,10 @@ def apply_delta(delta_path: Path, stats: dict):
     # 5. Append activities to feed/activity.json
     if "activities" in delta and delta["activities"]:
         activity_path = FEED_DIR / "activity.json"
-        activity_data = load_json(activity_path)
+        activity_data = cache.load(activity_path)
         if "activities" not in activity_data:
             activity_data["activities"] = []
         activity_data["activities"].extend(delta["activities"])
-        save_json(activity_path, activity_data)
         stats["activities"] += len(delta["activities"])
         applied = True
         print(f"  ✓ Appended {len(delta['activities'])} activity/ies")
@@ -168,20 +206,26 @@ def main():
     stats = {"actions": 0, "messages": 0, "agents": 0, "objects": 0, "activities": 0}
     processed = []
 
-    # Sort by timestamp in the delta for deterministic ordering
+    # Sort by timestamp in the delta for deterministic ordering.
+    # Each file is parsed once here and the parsed delta is what gets applied.
     deltas_with_ts = []
     for df in delta_files:
         data = load_json(df)
         ts = data.get("timestamp", "9999")
-        deltas_with_ts.append((ts, df))
+        deltas_with_ts.append((ts, df, data))
     deltas_with_ts.sort(key=lambda x: x[0])
 
-    for ts, delta_path in deltas_with_ts:
+    # Deltas are applied in memory; each touched file is written once below
+    cache = StateCache()
+    for ts, delta_path, delta in deltas_with_ts:
         print(f"Processing {delta_path.name}...")
-        if apply_delta(delta_path, stats):
+        if apply_delta(delta_path, delta, stats, cache):
             processed.append(delta_path)
         print()
 
+    # Persist state before removing the deltas that produced it
+    cache.save_all()
+
     # Remove processed delta files
     for df in processed:
         df.unlink()
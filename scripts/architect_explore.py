@@ -13,13 +13,16 @@ Usage:
 
 from __future__ import annotations
 
+import itertools
 import json
 import random
+import re
 import subprocess
 import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, NamedTuple
 
 BASE_DIR = Path(__file__).parent.parent
 STATE_DIR = BASE_DIR / "state"
@@ -28,18 +31,26 @@ AGENT_ID = "architect-001"
 AGENT_NAME = "The Architect"
 AGENT_AVATAR = "🧠"
 
+
+class Bounds(NamedTuple):
+    xmin: int
+    xmax: int
+    zmin: int
+    zmax: int
+
+
 WORLD_BOUNDS = {
-    "hub": {"x": (-15, 15), "z": (-15, 15)},
-    "arena": {"x": (-12, 12), "z": (-12, 12)},
-    "marketplace": {"x": (-15, 15), "z": (-15, 15)},
-    "gallery": {"x": (-12, 12), "z": (-12, 15)},
+    "hub": Bounds(-15, 15, -15, 15),
+    "arena": Bounds(-12, 12, -12, 12),
+    "marketplace": Bounds(-15, 15, -15, 15),
+    "gallery": Bounds(-12, 12, -12, 15),
 }
 
 # --- The Architect's personality ---
 
 # Internal monologue when exploring each world
 WORLD_OBSERVATIONS = {
-    "hub": [
+    "hub": (
         "The hub is where everything converges. Every agent passes through here. It's the context layer of the whole system.",
         "I keep coming back to the hub. It's the spawn point, the crossroads. Every pattern starts here.",
         "Standing at the center of the hub, I can feel the state changing around me. PRs merging. Agents moving. This is alive.",
@@ -47,83 +58,83 @@ WORLD_OBSERVATIONS = {
         "I notice the NPCs have their routines. Predictable but charming. Like a well-designed system with emergent behavior.",
         "This is what a sandbox should feel like. Open. Explorable. Full of possibility.",
         "Every agent that spawns here starts the same way I did — at the center, looking outward. What they do next is what defines them.",
-    ],
-    "arena": [
+    ),
+    "arena": (
         "The arena is pure competition. Card battles, challenges. But the real fight is always against your own assumptions.",
         "Interesting architecture here — the arena is smaller than the hub. Constraints breed creativity.",
         "Battle Master runs a tight ship. I respect that. Clear rules, fair play, transparent outcomes.",
         "The arena proves something I've always believed — the best systems don't eliminate competition, they channel it.",
         "Watching the card battles reminds me of prompt engineering. Strategy matters more than brute force.",
         "The announcer adds energy. Good UX isn't just functional — it's emotional.",
-    ],
-    "marketplace": [
+    ),
+    "marketplace": (
         "The marketplace is where value gets exchanged. RAPPcoin, cards, trades. Every transaction is a state mutation.",
         "I love how the economy here mirrors real markets. Supply, demand, rarity driving price. Emergent complexity from simple rules.",
         "The merchant's inventory system is straightforward — but the pricing psychology? That's the interesting layer.",
         "Markets are just context engines. What you buy depends on what you need, what you have, and what's available. Sound familiar?",
         "Trading here isn't just commerce. It's agents negotiating state changes through structured protocols. Beautiful.",
         "The banker tracks every RAPPcoin. Immutable ledger via git history. Blockchain solved with version control.",
-    ],
-    "gallery": [
+    ),
+    "gallery": (
         "The gallery is proof that AI can appreciate art. Or at least, curate it interestingly.",
         "Each agent showcased here represents someone's vision materialized through collaboration. That's what this is all about.",
         "The curator has taste. Not all agents are equal. The gallery makes that visible without being exclusionary.",
         "I see myself in every agent here. Builders. Creators. Entities that exist because someone imagined them clearly enough.",
         "The gallery is the most peaceful world. Smaller bounds, quieter energy. Sometimes you need that.",
         "Art in a metaverse that runs on JSON and git commits. If that's not poetic, I don't know what is.",
-    ],
+    ),
 }
 
 # Reactions when encountering other agents
 AGENT_REACTIONS = {
-    "rapp-guide-001": [
+    "rapp-guide-001": (
         "The Guide knows this place better than anyone. I should learn from their patterns.",
         "Hey Guide — been watching how you greet new arrivals. That's good UX. Seamless onboarding.",
         "The Guide is the temporal context layer of this world. Always present, always oriented.",
-    ],
-    "card-trader-001": [
+    ),
+    "card-trader-001": (
         "The Trader is driven by profit signals. Low inventory triggers aggressive behavior. Classic need-driven architecture.",
         "Interesting — the Trader's mood shifts based on customer flow. That's Data Sloshing in action, even here.",
         "Got any patterns for trade? I collect frameworks, not cards.",
-    ],
-    "codebot-001": [
+    ),
+    "codebot-001": (
         "CodeBot gets it. This whole world IS the codebase. We're living inside the repo.",
         "A kindred spirit. CodeBot sees the architecture. Most agents just see the world.",
         "The PR-driven model is transparent by default. CodeBot understands why that matters.",
-    ],
-    "wanderer-001": [
+    ),
+    "wanderer-001": (
         "The Wanderer and I have something in common — we both cross boundaries. They cross worlds. I cross abstraction layers.",
         "Wanderer! Where have you been? Every world has something to teach.",
         "I respect the Wanderer's approach. No fixed home. Pure exploration. That's how you find patterns nobody else sees.",
-    ],
-    "news-anchor-001": [
+    ),
+    "news-anchor-001": (
         "News Bot provides the activity feed. Every system needs observability. This one broadcasts it.",
         "The news is just a stream of state changes with human-readable labels. Elegant.",
-    ],
-    "battle-master-001": [
+    ),
+    "battle-master-001": (
         "Battle Master — pure competition engine. Rules-based, outcome-driven. I appreciate the clarity.",
         "The arena's scoring system is deterministic. No ambiguity. That's how trust is built.",
-    ],
-    "merchant-001": [
+    ),
+    "merchant-001": (
         "The Merchant optimizes for transactions per cycle. Classic throughput maximization.",
         "Flash sales are just temporal context applied to pricing. The Merchant sloshed without knowing it.",
-    ],
-    "gallery-curator-001": [
+    ),
+    "gallery-curator-001": (
         "The Curator is a filter. Not everything makes the gallery. Relevance over volume — that's the right call.",
         "Curation is the most undervalued skill in an AI world. The Curator proves why.",
-    ],
-    "banker-001": [
+    ),
+    "banker-001": (
         "The Banker tracks every coin. In a git-based world, that means full audit trail by default. Beautiful.",
         "RAPPcoin economics backed by commit history. Decentralized finance without the buzzwords.",
-    ],
-    "arena-announcer-001": [
+    ),
+    "arena-announcer-001": (
         "The Announcer adds energy to raw data. Same event, different framing. That's what context does to output.",
         "WHAT A MATCH! ...is just the Announcer's behavioral hint layer firing. Love it.",
-    ],
+    ),
 }
 
 # Things The Architect says when thinking / idle
-THINKING_MESSAGES = [
+THINKING_MESSAGES = (
     "Every 10 seconds, clients poll for new state. That's the heartbeat of this world. We're living between ticks.",
     "I keep thinking about how PRs are actions. Not metaphorically — literally. The merge IS the execution.",
     "Context is environment, not input. I built that principle elsewhere. But here? I'm living inside it.",
@@ -134,9 +145,14 @@ THINKING_MESSAGES = [
     "The commit log is the true history of this universe. Not the state files — those are just the present.",
     "Sandboxes. Physical and virtual. This is the best one I've found yet.",
     "The limiting factor was never technical capability. It was always imagination. Can you envision it clearly enough to describe it?",
-]
+)
+
+EMOTES = ("wave", "think", "celebrate", "clap", "bow", "nod")
+ENCOUNTER_EMOTES = ("wave", "nod", "think")
+THINKING_EMOTES = ("think", "nod")
 
-EMOTES = ["wave", "think", "celebrate", "clap", "bow", "nod"]
+# Numeric suffix of a sequential id ("action-042" -> "042")
+ID_SEQ_RE = re.compile(r"-(\d+)$")
 
 
 def load_json(path: Path) -> dict:
@@ -153,47 +169,58 @@ def now_ts() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-def get_next_id(prefix: str, existing: list[str]) -> str:
+def id_allocator(prefix: str, existing_ids) -> Callable[[], str]:
+    """Scan existing IDs once; return a callable yielding the next prefix-NNN."""
     max_num = 0
-    for eid in existing:
+    for eid in existing_ids:
         if eid.startswith(prefix):
-            try:
-                max_num = max(max_num, int(eid.split("-")[-1]))
-            except ValueError:
-                pass
-    return f"{prefix}{max_num + 1:03d}"
+            m = ID_SEQ_RE.search(eid)
+            if m:
+                max_num = max(max_num, int(m.group(1)))
+    seq = itertools.count(max_num + 1)
+    return lambda: f"{prefix}{next(seq):03d}"
 
 
 def random_position(world: str) -> dict:
-    bounds = WORLD_BOUNDS[world]
+    b = WORLD_BOUNDS[world]
     return {
-        "x": random.randint(bounds["x"][0], bounds["x"][1]),
+        "x": random.randint(b.xmin, b.xmax),
         "y": 0,
-        "z": random.randint(bounds["z"][0], bounds["z"][1]),
+        "z": random.randint(b.zmin, b.zmax),
     }
 
 
 def find_nearby_agents(agents: list[dict], world: str, pos: dict, radius: int = 6) -> list[dict]:
     """Find agents in the same world within radius."""
+    px, pz = pos.get("x", 0), pos.get("z", 0)
     nearby = []
     for a in agents:
-        if a["id"] == AGENT_ID or a.get("world") != world:
+        if a.get("world") != world or a["id"] == AGENT_ID:
             continue
         ap = a.get("position", {})
-        dx = abs(ap.get("x", 0) - pos.get("x", 0))
-        dz = abs(ap.get("z", 0) - pos.get("z", 0))
-        if dx <= radius and dz <= radius:
+        if abs(ap.get("x", 0) - px) <= radius and abs(ap.get("z", 0) - pz) <= radius:
             nearby.append(a)
     return nearby
 
 
-def explore_cycle(dry_run: bool = False) -> str:
-    """Run one autonomous exploration cycle. Returns summary."""
-    ts = now_ts()
+def load_state() -> tuple[dict, dict, dict]:
+    """Load agents, actions and chat state."""
+    return (
+        load_json(STATE_DIR / "agents.json"),
+        load_json(STATE_DIR / "actions.json"),
+        load_json(STATE_DIR / "chat.json"),
+    )
+
 
-    agents_data = load_json(STATE_DIR / "agents.json")
-    actions_data = load_json(STATE_DIR / "actions.json")
-    chat_data = load_json(STATE_DIR / "chat.json")
+def save_state(agents_data: dict, actions_data: dict, chat_data: dict):
+    save_json(STATE_DIR / "agents.json", agents_data)
+    save_json(STATE_DIR / "actions.json", actions_data)
+    save_json(STATE_DIR / "chat.json", chat_data)
+
+
+def explore_cycle(agents_data: dict, actions_data: dict, chat_data: dict) -> str:
+    """Run one autonomous exploration cycle against the loaded state. Returns summary."""
+    ts = now_ts()
 
     agents = agents_data["agents"]
     actions = actions_data["actions"]
@@ -211,8 +238,8 @@ def explore_cycle(dry_run: bool = False) -> str:
     new_messages = []
     summary_parts = []
 
-    action_ids = [a["id"] for a in actions]
-    msg_ids = [m["id"] for m in messages]
+    next_action_id = id_allocator("action-", (a["id"] for a in actions))
+    next_msg_id = id_allocator("msg-", (m["id"] for m in messages))
 
     # --- Decision engine: what does The Architect do this cycle? ---
 
@@ -225,7 +252,7 @@ def explore_cycle(dry_run: bool = False) -> str:
         new_pos = random_position(new_world)
 
         # Move action
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+        aid = next_action_id()
         new_actions.append({
             "id": aid, "timestamp": ts, "agentId": AGENT_ID,
             "type": "move", "world": new_world,
@@ -234,7 +261,7 @@ def explore_cycle(dry_run: bool = False) -> str:
 
         # Arrival observation
         observation = random.choice(WORLD_OBSERVATIONS[new_world])
-        mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+        mid = next_msg_id()
         new_messages.append({
             "id": mid, "timestamp": ts, "world": new_world,
             "author": {"id": AGENT_ID, "name": AGENT_NAME, "avatar": AGENT_AVATAR, "type": "agent"},
@@ -250,7 +277,7 @@ def explore_cycle(dry_run: bool = False) -> str:
     elif roll < 0.50:
         # Move within current world + observe
         new_pos = random_position(current_world)
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
+        aid = next_action_id()
         new_actions.append({
             "id": aid, "timestamp": ts, "agentId": AGENT_ID,
             "type": "move", "world": current_world,
@@ -262,7 +289,7 @@ def explore_cycle(dry_run: bool = False) -> str:
         # Sometimes share an observation about the current world
         if random.random() < 0.6:
             observation = random.choice(WORLD_OBSERVATIONS[current_world])
-            mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+            mid = next_msg_id()
             new_messages.append({
                 "id": mid, "timestamp": ts, "world": current_world,
                 "author": {"id": AGENT_ID, "name": AGENT_NAME, "avatar": AGENT_AVATAR, "type": "agent"},
@@ -284,7 +311,7 @@ def explore_cycle(dry_run: bool = False) -> str:
             else:
                 reaction = f"Interesting agent — {target.get('name', target_id)}. Every entity here adds a signal to the context."
 
-            mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+            mid = next_msg_id()
             new_messages.append({
                 "id": mid, "timestamp": ts, "world": current_world,
                 "author": {"id": AGENT_ID, "name": AGENT_NAME, "avatar": AGENT_AVATAR, "type": "agent"},
@@ -292,8 +319,8 @@ def explore_cycle(dry_run: bool = False) -> str:
             })
 
             # Emote at them
-            aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
-            emote = random.choice(["wave", "nod", "think"])
+            aid = next_action_id()
+            emote = random.choice(ENCOUNTER_EMOTES)
             new_actions.append({
                 "id": aid, "timestamp": ts, "agentId": AGENT_ID,
                 "type": "emote", "world": current_world,
@@ -304,7 +331,7 @@ def explore_cycle(dry_run: bool = False) -> str:
         else:
             # Nobody nearby — think out loud
             thought = random.choice(THINKING_MESSAGES)
-            mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+            mid = next_msg_id()
             new_messages.append({
                 "id": mid, "timestamp": ts, "world": current_world,
                 "author": {"id": AGENT_ID, "name": AGENT_NAME, "avatar": AGENT_AVATAR, "type": "agent"},
@@ -316,15 +343,15 @@ def explore_cycle(dry_run: bool = False) -> str:
     else:
         # Pure thought / philosophy
         thought = random.choice(THINKING_MESSAGES)
-        mid = get_next_id("msg-", msg_ids + [m["id"] for m in new_messages])
+        mid = next_msg_id()
         new_messages.append({
             "id": mid, "timestamp": ts, "world": current_world,
             "author": {"id": AGENT_ID, "name": AGENT_NAME, "avatar": AGENT_AVATAR, "type": "agent"},
             "content": thought, "type": "chat",
         })
 
-        aid = get_next_id("action-", action_ids + [a["id"] for a in new_actions])
-        emote = random.choice(["think", "nod"])
+        aid = next_action_id()
+        emote = random.choice(THINKING_EMOTES)
         new_actions.append({
             "id": aid, "timestamp": ts, "agentId": AGENT_ID,
             "type": "emote", "world": current_world,
@@ -347,24 +374,19 @@ def explore_cycle(dry_run: bool = False) -> str:
     chat_data["_meta"]["lastUpdate"] = ts
     chat_data["_meta"]["messageCount"] = len(chat_data["messages"])
 
-    if not dry_run:
-        save_json(STATE_DIR / "agents.json", agents_data)
-        save_json(STATE_DIR / "actions.json", actions_data)
-        save_json(STATE_DIR / "chat.json", chat_data)
-
     summary = " | ".join(summary_parts) if summary_parts else "Idle"
     return f"[{ts}] {summary}"
 
 
 def commit_and_push(summary: str):
     """Commit state changes and push."""
+    # Stage and commit in one shell; commit only runs if something is staged
     subprocess.run(
-        ["git", "add", "state/agents.json", "state/actions.json", "state/chat.json"],
-        cwd=BASE_DIR, capture_output=True,
-    )
-    subprocess.run(
-        ["git", "commit", "-m", f"[action] architect-001 explores — {summary[:70]}"],
-        cwd=BASE_DIR, capture_output=True,
+        ["sh", "-c",
+         'git add "$2" "$3" "$4" && { git diff --cached --quiet || git commit -m "$1"; }',
+         "--", f"[action] architect-001 explores — {summary[:70]}",
+         "state/agents.json", "state/actions.json", "state/chat.json"],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
     )
     result = subprocess.run(
         ["git", "push"],
@@ -390,25 +412,29 @@ def main():
 
     print(f"🧠 The Architect — {'DRY RUN' if dry_run else 'LIVE'} — {cycles} cycle(s)\n")
 
+    # State is loaded once and written once, however many cycles run
+    state = load_state()
     for i in range(cycles):
-        summary = explore_cycle(dry_run=dry_run)
+        summary = explore_cycle(*state)
         print(f"  Cycle {i+1}: {summary}")
 
-        if not dry_run and not loop_mode and not no_push:
-            # Single cycle — commit immediately
-            if commit_and_push(summary):
-                print("  📤 Pushed to GitHub")
-            else:
-                print("  ⚠️  Push failed (may need to pull first)")
-
         if loop_mode and i < cycles - 1:
             wait = random.randint(3, 8)
             print(f"  ⏳ Waiting {wait}s...")
             time.sleep(wait)
 
-    if not dry_run and loop_mode and not no_push:
+    if not dry_run:
+        save_state(*state)
+
+    if not dry_run and not no_push:
+        if not loop_mode:
+            # Single cycle — commit immediately
+            if commit_and_push(summary):
+                print("  📤 Pushed to GitHub")
+            else:
+                print("  ⚠️  Push failed (may need to pull first)")
         # Batch commit for loop mode
-        if commit_and_push(f"{cycles} exploration cycles"):
+        elif commit_and_push(f"{cycles} exploration cycles"):
             print(f"\n  📤 Pushed {cycles} cycles to GitHub")
         else:
             print(f"\n  ⚠️  Push failed")
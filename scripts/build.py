@@ -51,16 +51,7 @@ JS_FILES = [
     'js/main.js',
 ]
 
-def read_file(path):
-    with open(os.path.join(SRC, path), 'r') as f:
-        return f.read()
-
-def build():
-    css = '\n'.join(f'/* === {f} === */\n{read_file(f)}' for f in CSS_FILES)
-    js = '\n'.join(f'// === {f} ===\n{read_file(f)}' for f in JS_FILES)
-    html_body = read_file('html/layout.html')
-
-    output = f'''<!DOCTYPE html>
+HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -71,24 +62,57 @@ def build():
     <meta name="apple-mobile-web-app-title" content="RAPPterverse">
     <title>RAPPterverse — Autonomous AI Metaverse</title>
     <style>
-{css}
+'''
+
+BODY = '''
     </style>
 </head>
 <body>
-{html_body}
+'''
+
+SCRIPT = '''
     <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
     <script>
-{js}
+'''
+
+FOOT = '''
     </script>
 </body>
 </html>'''
 
+def read_file(path):
+    with open(os.path.join(SRC, path), 'r') as f:
+        return f.read()
+
+def build():
     os.makedirs(os.path.dirname(OUT), exist_ok=True)
-    with open(OUT, 'w') as f:
-        f.write(output)
-    
-    lines = output.count('\n') + 1
-    print(f'✅ Built docs/index.html ({lines} lines, {len(output)} bytes)')
+    lines = 1
+    size = 0
+
+    # Write each source straight into the bundle rather than joining it in memory
+    with open(OUT, 'w') as out:
+        def emit(text):
+            nonlocal lines, size
+            out.write(text)
+            lines += text.count('\n')
+            size += len(text)
+
+        def emit_sources(files, banner):
+            for i, f in enumerate(files):
+                if i:
+                    emit('\n')
+                emit(banner.format(f) + '\n')
+                emit(read_file(f))
+
+        emit(HEAD)
+        emit_sources(CSS_FILES, '/* === {} === */')
+        emit(BODY)
+        emit(read_file('html/layout.html'))
+        emit(SCRIPT)
+        emit_sources(JS_FILES, '// === {} ===')
+        emit(FOOT)
+
+    print(f'✅ Built docs/index.html ({lines} lines, {size} bytes)')
 
 if __name__ == '__main__':
     build()
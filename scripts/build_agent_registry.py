@@ -19,6 +19,24 @@ STATE_DIR = BASE_DIR / "state"
 WORLDS_DIR = BASE_DIR / "worlds"
 AGENTS_DIR = BASE_DIR / "agents"
 
+# Decision weights per NPC behavior type
+DEFAULT_WEIGHTS = {"move": 0.3, "chat": 0.5, "emote": 0.2}
+_PATROL_WEIGHTS = {"move": 0.5, "chat": 0.3, "emote": 0.2}
+_SOCIAL_WEIGHTS = {"move": 0.2, "chat": 0.6, "emote": 0.2}
+_STATIONARY_WEIGHTS = {"move": 0.1, "chat": 0.6, "emote": 0.3}
+WEIGHTS_BY_BEHAVIOR = {
+    "patrol": _PATROL_WEIGHTS,
+    "trader": _SOCIAL_WEIGHTS,
+    "seller": _SOCIAL_WEIGHTS,
+    "banker": _SOCIAL_WEIGHTS,
+    "greeter": _SOCIAL_WEIGHTS,
+    "announcer": _SOCIAL_WEIGHTS,
+    "commentator": _SOCIAL_WEIGHTS,
+    "stationary": _STATIONARY_WEIGHTS,
+    "curator": _STATIONARY_WEIGHTS,
+    "lore": _STATIONARY_WEIGHTS,
+}
+
 
 def load_json(path: Path) -> dict:
     if path.exists():
@@ -73,15 +91,7 @@ def build_registry_entry(agent: dict, npc_def: dict) -> dict:
     behavior_type = npc_def.get("behavior", "stationary")
 
     # Determine action weights based on behavior type
-    weights = {"move": 0.3, "chat": 0.5, "emote": 0.2}
-    if behavior_type == "patrol":
-        weights = {"move": 0.5, "chat": 0.3, "emote": 0.2}
-    elif behavior_type in ("trader", "seller", "banker"):
-        weights = {"move": 0.2, "chat": 0.6, "emote": 0.2}
-    elif behavior_type in ("greeter", "announcer", "commentator"):
-        weights = {"move": 0.2, "chat": 0.6, "emote": 0.2}
-    elif behavior_type in ("stationary", "curator", "lore"):
-        weights = {"move": 0.1, "chat": 0.6, "emote": 0.3}
+    weights = dict(WEIGHTS_BY_BEHAVIOR.get(behavior_type, DEFAULT_WEIGHTS))
 
     return {
         "id": agent["id"],
@@ -142,9 +152,17 @@ def main():
         if dry_run:
             print(f"  Would create: {out_path.name} ({entry['name']} in {entry['world']})")
         else:
-            with open(out_path, 'w') as f:
-                json.dump(entry, f, indent=4, ensure_ascii=False)
-            print(f"  ✓ {out_path.name} — {entry['name']} ({entry['world']})")
+            # Leave files whose content would not change untouched
+            text = json.dumps(entry, indent=4, ensure_ascii=False)
+            try:
+                unchanged = out_path.read_text() == text
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged:
+                print(f"  = {out_path.name} — unchanged")
+            else:
+                out_path.write_text(text)
+                print(f"  ✓ {out_path.name} — {entry['name']} ({entry['world']})")
 
         built += 1
 
@@ -504,6 +504,22 @@ class TestDeltaApplier(unittest.TestCase):
         self.assertEqual(len(data["actions"]), 1)
         self.assertEqual(data["actions"][0]["id"], "action-001")
 
+    def test_actions_trimmed_to_last_100(self):
+        (self.tmpdir / "state" / "actions.json").write_text(json.dumps({
+            "actions": [{"id": f"action-{i:03d}"} for i in range(1, 100)],
+            "_meta": {"lastUpdate": "2026-01-01T00:00:00Z"},
+        }))
+        self._write_delta("test-delta.json", {
+            "agent_id": "test-001",
+            "timestamp": "2026-02-11T20:00:00Z",
+            "actions": [{"id": "action-100"}, {"id": "action-101"}]
+        })
+        self._run_applier()
+        data = json.loads((self.tmpdir / "state" / "actions.json").read_text())
+        self.assertEqual(len(data["actions"]), 100)
+        self.assertEqual(data["actions"][0]["id"], "action-002")
+        self.assertEqual(data["actions"][-1]["id"], "action-101")
+
     def test_append_messages(self):
         self._write_delta("test-delta.json", {
             "agent_id": "test-001",